@@ -4,7 +4,7 @@ import numpy as np
 import plotly.express as px
 import altair as alt
 from datetime import datetime, timedelta
-import calendar
+import io
 
 # Set page configuration
 st.set_page_config(
@@ -15,7 +15,7 @@ st.set_page_config(
 )
 
 # Custom CSS for styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -60,73 +60,101 @@ st.markdown("""
         color: white;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+# AQI category thresholds drawn across the full width of the trend chart
+AQI_THRESHOLD_LINES = [
+    dict(type="line", xref="paper", x0=0, x1=1, y0=y, y1=y,
+         line=dict(color=color, width=1, dash="dash"))
+    for y, color in [(50, "green"), (100, "yellow"), (150, "orange"), (200, "red"), (300, "purple")]
+]
+
+# AQI category upper bounds, names and colors, indexed by category code
+AQI_CATEGORY_BOUNDS = np.array([50, 100, 150, 200, 300])
+AQI_CATEGORY_NAMES = np.array(["Good", "Moderate", "Unhealthy for Sensitive Groups", "Unhealthy", "Very Unhealthy", "Hazardous"])
+AQI_CATEGORY_COLORS = np.array(["#00e400", "#ffff00", "#ff7e00", "#ff0000", "#99004c", "#7e0023"])
+
+# AQI category descriptions shown below the calendar view
+AQI_CATEGORIES = [
+    {"range": "0-50", "category": "Good", "color": "#00e400", "description": "Air quality is satisfactory, and air pollution poses little or no risk."},
+    {"range": "51-100", "category": "Moderate", "color": "#ffff00", "description": "Air quality is acceptable. However, there may be a risk for some people, particularly those who are unusually sensitive to air pollution."},
+    {"range": "101-150", "category": "Unhealthy for Sensitive Groups", "color": "#ff7e00", "description": "Members of sensitive groups may experience health effects. The general public is less likely to be affected."},
+    {"range": "151-200", "category": "Unhealthy", "color": "#ff0000", "description": "Some members of the general public may experience health effects; members of sensitive groups may experience more serious health effects."},
+    {"range": "201-300", "category": "Very Unhealthy", "color": "#99004c", "description": "Health alert: The risk of health effects is increased for everyone."},
+    {"range": "301+", "category": "Hazardous", "color": "#7e0023", "description": "Health warning of emergency conditions: everyone is more likely to be affected."}
+]
+
+# The categories legend is static, so render it to a single HTML block once
+AQI_CATEGORY_LEGEND_HTML = "".join(
+    f"<div style='display: flex; align-items: center; gap: 8px; margin: 4px 0;'>"
+    f"<div style='background-color: {c['color']}; width: 50px; height: 20px; border-radius: 4px; flex-shrink: 0;'></div>"
+    f"<div><b>{c['category']} ({c['range']})</b>: {c['description']}</div>"
+    f"</div>"
+    for c in AQI_CATEGORIES
+)
+
+# City-specific baseline and pollutant-specific factors for the sample data
+SAMPLE_CITY_FACTORS = {
+    "New York": 1.1,
+    "Los Angeles": 1.3,
+    "Chicago": 0.9,
+    "Houston": 1.0,
+    "Phoenix": 1.2
+}
+SAMPLE_POLLUTANT_FACTORS = {
+    "PM2.5": 1.2,
+    "PM10": 1.1,
+    "O3": 1.0,
+    "NO2": 0.9,
+    "SO2": 0.8,
+    "CO": 0.7
+}
 
 # Helper functions
+def get_aqi_category_code(aqi_value):
+    """Return the index of the AQI category for a value or array of values"""
+    return np.searchsorted(AQI_CATEGORY_BOUNDS, aqi_value, side='left')
+
 def get_aqi_category(aqi_value):
     """Return AQI category and color based on value"""
-    if aqi_value <= 50:
-        return "Good", "#00e400"
-    elif aqi_value <= 100:
-        return "Moderate", "#ffff00"
-    elif aqi_value <= 150:
-        return "Unhealthy for Sensitive Groups", "#ff7e00"
-    elif aqi_value <= 200:
-        return "Unhealthy", "#ff0000"
-    elif aqi_value <= 300:
-        return "Very Unhealthy", "#99004c"
-    else:
-        return "Hazardous", "#7e0023"
+    code = get_aqi_category_code(aqi_value)
+    return AQI_CATEGORY_NAMES[code], AQI_CATEGORY_COLORS[code]
 
+@st.cache_data(ttl=3600)
 def generate_sample_data():
     """Generate sample AQI data if user doesn't upload a file"""
-    cities = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix"]
-    pollutants = ["PM2.5", "PM10", "O3", "NO2", "SO2", "CO"]
+    cities = list(SAMPLE_CITY_FACTORS)
+    pollutants = list(SAMPLE_POLLUTANT_FACTORS)
     
     # Generate dates for the last 30 days
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
     dates = pd.date_range(start=start_date, end=end_date, freq='D')
     
-    data = []
-    for city in cities:
-        for date in dates:
-            for pollutant in pollutants:
-                # Generate random AQI value with some trend
-                base_aqi = np.random.randint(30, 180)
-                # Add some weekly pattern
-                day_of_week = date.weekday()
-                weekday_factor = 1.2 if day_of_week < 5 else 0.8  # Higher on weekdays
-                
-                # Add city-specific baseline
-                city_factor = {
-                    "New York": 1.1,
-                    "Los Angeles": 1.3,
-                    "Chicago": 0.9,
-                    "Houston": 1.0,
-                    "Phoenix": 1.2
-                }[city]
-                
-                # Add pollutant-specific factor
-                pollutant_factor = {
-                    "PM2.5": 1.2,
-                    "PM10": 1.1,
-                    "O3": 1.0,
-                    "NO2": 0.9,
-                    "SO2": 0.8,
-                    "CO": 0.7
-                }[pollutant]
-                
-                aqi = int(base_aqi * weekday_factor * city_factor * pollutant_factor)
-                
-                data.append({
-                    "Date": date,
-                    "City": city,
-                    "Pollutant": pollutant,
-                    "AQI": aqi
-                })
+    # Factor arrays aligned with the city and pollutant axes
+    city_factors = np.fromiter(SAMPLE_CITY_FACTORS.values(), dtype=float)
+    pollutant_factors = np.fromiter(SAMPLE_POLLUTANT_FACTORS.values(), dtype=float)
+    # Add some weekly pattern (higher on weekdays)
+    weekday_factors = np.where(dates.weekday < 5, 1.2, 0.8)
     
-    return pd.DataFrame(data)
+    # Generate random AQI values for every city/date/pollutant combination at once
+    base_aqi = np.random.randint(30, 180, size=(len(cities), len(dates), len(pollutants)))
+    aqi = (base_aqi
+           * city_factors[:, None, None]
+           * weekday_factors[None, :, None]
+           * pollutant_factors[None, None, :]).astype(np.int16)
+    
+    index = pd.MultiIndex.from_product([cities, dates, pollutants], names=["City", "Date", "Pollutant"])
+    data = pd.DataFrame({"AQI": aqi.ravel()}, index=index).reset_index()
+    data = data[["Date", "City", "Pollutant", "AQI"]]
+    
+    # Store low-cardinality text columns as categoricals
+    data["City"] = data["City"].astype("category")
+    data["Pollutant"] = data["Pollutant"].astype("category")
+    
+    return data
 
 def preprocess_data(df):
     """Preprocess the uploaded data"""
@@ -142,8 +170,82 @@ def preprocess_data(df):
         st.error(f"Missing required columns: {', '.join(missing_columns)}")
         st.stop()
     
+    # AQI values are small integers; store them in the narrowest integer type that fits
+    df['AQI'] = pd.to_numeric(df['AQI'], downcast='integer')
+    
+    # Store low-cardinality text columns as categoricals for faster filters and groupbys
+    for col in ['City', 'Pollutant']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
     return df
 
+@st.cache_data(max_entries=5)
+def load_csv(file_bytes):
+    """Parse and preprocess uploaded CSV bytes once per upload"""
+    # Read the header first so dates and categoricals can be parsed while tokenizing
+    columns = pd.read_csv(io.BytesIO(file_bytes), nrows=0).columns
+    dtypes = {col: 'category' for col in ['City', 'Pollutant'] if col in columns}
+    parse_dates = ['Date'] if 'Date' in columns else False
+    
+    df = pd.read_csv(io.BytesIO(file_bytes), dtype=dtypes, parse_dates=parse_dates)
+    return preprocess_data(df)
+
+@st.cache_data(max_entries=5)
+def get_filter_options(data_key, _df):
+    """Return the bounds and choices offered by the sidebar filters"""
+    return {
+        "min_date": _df['Date'].min().date(),
+        "max_date": _df['Date'].max().date(),
+        "cities": _df['City'].cat.categories.tolist(),
+        "pollutants": _df['Pollutant'].cat.categories.tolist() if 'Pollutant' in _df.columns else [],
+        "min_aqi": int(_df['AQI'].min()),
+        "max_aqi": int(_df['AQI'].max()),
+    }
+
+@st.cache_data(max_entries=20)
+def get_city_stats(filter_key, _df):
+    """Return mean, min, max and std of AQI per city"""
+    return _df.groupby('City', observed=True)['AQI'].agg(['mean', 'min', 'max', 'std'])
+
+@st.cache_data(max_entries=20)
+def get_trend_data(filter_key, _df, pollutant=None):
+    """Return average AQI per date and city, optionally for a single pollutant"""
+    df = _df if pollutant is None else _df[_df['Pollutant'] == pollutant]
+    # Keep the default key sort: line traces are drawn in row order, so dates must be ascending
+    line_data = df.groupby(['Date', 'City'], observed=True, as_index=False)['AQI'].mean()
+    # Plotly groups by every category of a categorical column, so drop unselected cities
+    line_data['City'] = line_data['City'].cat.remove_unused_categories()
+    return line_data
+
+@st.cache_data(max_entries=20)
+def get_comparison_data(filter_key, _df, by_pollutant=False):
+    """Return average AQI per city, optionally split by pollutant"""
+    if by_pollutant:
+        return _df.groupby(['City', 'Pollutant'], sort=False, observed=True, as_index=False)['AQI'].mean()
+    return _df.groupby('City', sort=False, observed=True, as_index=False)['AQI'].mean()
+
+@st.cache_data(max_entries=20)
+def get_daily_data(filter_key, _df, city, pollutant=None):
+    """Return a city's average AQI per date, optionally for a single pollutant"""
+    df = _df[_df['City'] == city]
+    if pollutant is not None:
+        df = df[df['Pollutant'] == pollutant]
+    daily_data = df.groupby('Date', sort=False, as_index=False)['AQI'].mean()
+    # Send wall-clock dates without an offset so the chart's day and month time units
+    # match the data's own time zone rather than the viewer's
+    if daily_data['Date'].dt.tz is not None:
+        daily_data['Date'] = daily_data['Date'].dt.tz_localize(None)
+    return daily_data
+
+@st.cache_data(max_entries=20)
+def convert_df_to_csv(filter_key, _df):
+    """Serialize a DataFrame to CSV bytes for download"""
+    # Write straight into a bytes buffer instead of building and encoding a str
+    buffer = io.BytesIO()
+    _df.to_csv(buffer, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
 # Sidebar for data upload and filters
 st.sidebar.markdown("## Data Input")
 
@@ -157,8 +259,8 @@ if data_option == "Upload CSV":
     uploaded_file = st.sidebar.file_uploader("Upload AQI data (CSV)", type="csv")
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file)
-            df = preprocess_data(df)
+            df = load_csv(uploaded_file.getvalue())
+            data_key = ("upload", uploaded_file.file_id)
         except Exception as e:
             st.error(f"Error reading the file: {e}")
             st.stop()
@@ -167,13 +269,17 @@ if data_option == "Upload CSV":
         st.stop()
 else:
     df = generate_sample_data()
+    # The latest sample date is the generation time, so the key changes whenever
+    # the cached sample data is regenerated
+    data_key = ("sample", df['Date'].max())
 
 # Filters
 st.sidebar.markdown("## Filters")
+filter_options = get_filter_options(data_key, df)
 
 # Date range filter
-min_date = df['Date'].min().date()
-max_date = df['Date'].max().date()
+min_date = filter_options["min_date"]
+max_date = filter_options["max_date"]
 
 date_range = st.sidebar.date_input(
     "Select Date Range",
@@ -182,14 +288,21 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
+# All filters are combined into one boolean mask and applied once at the end,
+# so no intermediate DataFrames are built between the individual filters
+filter_mask = pd.Series(True, index=df.index)
+
 if len(date_range) == 2:
     start_date, end_date = date_range
-    df_filtered = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]
-else:
-    df_filtered = df.copy()
+    # Compare on the datetime64 column directly; end date is inclusive of the whole day.
+    # Bounds are built in the column's time zone so tz-aware uploads compare correctly.
+    date_tz = df['Date'].dt.tz
+    start_ts = pd.Timestamp(start_date, tz=date_tz)
+    end_ts = pd.Timestamp(end_date, tz=date_tz) + pd.Timedelta(days=1)
+    filter_mask &= (df['Date'] >= start_ts) & (df['Date'] < end_ts)
 
 # City filter
-available_cities = sorted(df['City'].unique())
+available_cities = filter_options["cities"]
 selected_cities = st.sidebar.multiselect(
     "Select Cities",
     available_cities,
@@ -197,11 +310,12 @@ selected_cities = st.sidebar.multiselect(
 )
 
 if selected_cities:
-    df_filtered = df_filtered[df_filtered['City'].isin(selected_cities)]
+    filter_mask &= df['City'].isin(selected_cities)
 
 # Pollutant filter (if available)
+selected_pollutants = []
 if 'Pollutant' in df.columns:
-    available_pollutants = sorted(df['Pollutant'].unique())
+    available_pollutants = filter_options["pollutants"]
     selected_pollutants = st.sidebar.multiselect(
         "Select Pollutants",
         available_pollutants,
@@ -209,11 +323,11 @@ if 'Pollutant' in df.columns:
     )
     
     if selected_pollutants:
-        df_filtered = df_filtered[df_filtered['Pollutant'].isin(selected_pollutants)]
+        filter_mask &= df['Pollutant'].isin(selected_pollutants)
 
 # AQI range filter
-min_aqi = int(df['AQI'].min())
-max_aqi = int(df['AQI'].max())
+min_aqi = filter_options["min_aqi"]
+max_aqi = filter_options["max_aqi"]
 
 aqi_range = st.sidebar.slider(
     "AQI Range",
@@ -222,11 +336,19 @@ aqi_range = st.sidebar.slider(
     value=(min_aqi, max_aqi)
 )
 
-df_filtered = df_filtered[(df_filtered['AQI'] >= aqi_range[0]) & (df_filtered['AQI'] <= aqi_range[1])]
+filter_mask &= (df['AQI'] >= aqi_range[0]) & (df['AQI'] <= aqi_range[1])
+
+# Skip the boolean-index copy entirely when no filter narrows the data
+# (e.g. while only one end of the date range has been picked)
+df_filtered = df if filter_mask.all() else df[filter_mask]
+
+# Cache key identifying df_filtered; the cached helpers below take the frame
+# itself as an unhashed argument so it is not re-hashed on every rerun
+filter_key = (data_key, tuple(date_range), tuple(selected_cities), tuple(selected_pollutants), aqi_range)
 
 # Option to download filtered data
 if not df_filtered.empty:
-    csv = df_filtered.to_csv(index=False)
+    csv = convert_df_to_csv(filter_key, df_filtered)
     st.sidebar.download_button(
         label="Download Filtered Data",
         data=csv,
@@ -237,6 +359,9 @@ if not df_filtered.empty:
 # Main dashboard
 st.markdown("<h1 class='main-header'>Air Quality Index Dashboard</h1>", unsafe_allow_html=True)
 
+# Per-city aggregates shared by the KPI cards and the detailed statistics table
+city_stats = get_city_stats(filter_key, df_filtered)
+
 # KPI Cards
 if not df_filtered.empty and selected_cities:
     # Get the most recent date in the filtered data
@@ -263,9 +388,10 @@ if not df_filtered.empty and selected_cities:
     
     # KPI 2: Highest AQI in selected period
     with kpi2:
-        highest_aqi = int(df_filtered['AQI'].max())
-        highest_city = df_filtered[df_filtered['AQI'] == highest_aqi]['City'].values[0]
-        highest_date = df_filtered[df_filtered['AQI'] == highest_aqi]['Date'].dt.date.values[0]
+        highest_row = df_filtered.loc[df_filtered['AQI'].idxmax()]
+        highest_aqi = int(highest_row['AQI'])
+        highest_city = highest_row['City']
+        highest_date = highest_row['Date'].date()
         category, color = get_aqi_category(highest_aqi)
         
         st.markdown(f"""
@@ -278,9 +404,10 @@ if not df_filtered.empty and selected_cities:
     
     # KPI 3: Lowest AQI in selected period
     with kpi3:
-        lowest_aqi = int(df_filtered['AQI'].min())
-        lowest_city = df_filtered[df_filtered['AQI'] == lowest_aqi]['City'].values[0]
-        lowest_date = df_filtered[df_filtered['AQI'] == lowest_aqi]['Date'].dt.date.values[0]
+        lowest_row = df_filtered.loc[df_filtered['AQI'].idxmin()]
+        lowest_aqi = int(lowest_row['AQI'])
+        lowest_city = lowest_row['City']
+        lowest_date = lowest_row['Date'].date()
         category, color = get_aqi_category(lowest_aqi)
         
         st.markdown(f"""
@@ -293,15 +420,14 @@ if not df_filtered.empty and selected_cities:
     
     # KPI 4: Most polluted city
     with kpi4:
-        city_avg = df_filtered.groupby('City')['AQI'].mean().reset_index()
-        most_polluted = city_avg.loc[city_avg['AQI'].idxmax()]
-        avg_aqi = int(most_polluted['AQI'])
+        most_polluted_city = city_stats['mean'].idxmax()
+        avg_aqi = int(city_stats.loc[most_polluted_city, 'mean'])
         category, color = get_aqi_category(avg_aqi)
         
         st.markdown(f"""
         <div class='kpi-card'>
             <div class='kpi-label'>Most Polluted City</div>
-            <div class='kpi-value' style='color:{color}'>{most_polluted['City']}</div>
+            <div class='kpi-value' style='color:{color}'>{most_polluted_city}</div>
             <div class='kpi-unit'>Avg AQI: {avg_aqi}</div>
         </div>
         """, unsafe_allow_html=True)
@@ -317,8 +443,7 @@ with tabs[0]:
         # Prepare data for line chart
         if 'Pollutant' in df_filtered.columns and selected_pollutants:
             # If pollutant filter is active, show trends for selected pollutant across cities
-            trend_data = df_filtered[df_filtered['Pollutant'] == selected_pollutants[0]]
-            line_data = trend_data.groupby(['Date', 'City'])['AQI'].mean().reset_index()
+            line_data = get_trend_data(filter_key, df_filtered, selected_pollutants[0])
             
             fig = px.line(
                 line_data,
@@ -327,12 +452,12 @@ with tabs[0]:
                 color="City",
                 title=f"AQI Trends for {selected_pollutants[0]}",
                 labels={"AQI": "Air Quality Index", "Date": "Date"},
-                line_shape="spline",
-                render_mode="svg"
+                line_shape="linear",
+                render_mode="webgl"
             )
         else:
             # If no pollutant filter, show overall AQI trends by city
-            line_data = df_filtered.groupby(['Date', 'City'])['AQI'].mean().reset_index()
+            line_data = get_trend_data(filter_key, df_filtered)
             
             fig = px.line(
                 line_data,
@@ -341,24 +466,13 @@ with tabs[0]:
                 color="City",
                 title="Overall AQI Trends",
                 labels={"AQI": "Air Quality Index", "Date": "Date"},
-                line_shape="spline",
-                render_mode="svg"
+                line_shape="linear",
+                render_mode="webgl"
             )
         
-        # Add AQI category thresholds
-        fig.add_shape(type="line", x0=min_date, x1=max_date, y0=50, y1=50,
-                    line=dict(color="green", width=1, dash="dash"))
-        fig.add_shape(type="line", x0=min_date, x1=max_date, y0=100, y1=100,
-                    line=dict(color="yellow", width=1, dash="dash"))
-        fig.add_shape(type="line", x0=min_date, x1=max_date, y0=150, y1=150,
-                    line=dict(color="orange", width=1, dash="dash"))
-        fig.add_shape(type="line", x0=min_date, x1=max_date, y0=200, y1=200,
-                    line=dict(color="red", width=1, dash="dash"))
-        fig.add_shape(type="line", x0=min_date, x1=max_date, y0=300, y1=300,
-                    line=dict(color="purple", width=1, dash="dash"))
-        
         # Update layout
         fig.update_layout(
+            shapes=AQI_THRESHOLD_LINES,
             height=500,
             legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
             margin=dict(l=40, r=40, t=40, b=40),
@@ -377,8 +491,7 @@ with tabs[1]:
         # Prepare data for bar chart
         if 'Pollutant' in df_filtered.columns and selected_pollutants:
             # If pollutant filter is active, compare cities for each pollutant
-            comparison_data = df_filtered[df_filtered['Pollutant'].isin(selected_pollutants)]
-            bar_data = comparison_data.groupby(['City', 'Pollutant'])['AQI'].mean().reset_index()
+            bar_data = get_comparison_data(filter_key, df_filtered, by_pollutant=True)
             
             # Create Altair chart
             chart = alt.Chart(bar_data).mark_bar().encode(
@@ -396,7 +509,7 @@ with tabs[1]:
             )
         else:
             # If no pollutant filter, show overall AQI comparison
-            bar_data = df_filtered.groupby('City')['AQI'].mean().reset_index()
+            bar_data = get_comparison_data(filter_key, df_filtered)
             
             # Create color scale based on AQI values
             color_scale = alt.Scale(
@@ -422,7 +535,7 @@ with tabs[1]:
         
         # Add a table with detailed statistics
         st.subheader("Detailed Statistics by City")
-        stats_data = df_filtered.groupby('City')['AQI'].agg(['mean', 'min', 'max', 'std']).reset_index()
+        stats_data = city_stats.reset_index()
         stats_data.columns = ['City', 'Average AQI', 'Min AQI', 'Max AQI', 'Std Dev']
         stats_data = stats_data.round(1)
         
@@ -441,39 +554,27 @@ with tabs[2]:
             selected_cities
         )
         
-        # Filter data for selected city
-        city_data = df_filtered[df_filtered['City'] == calendar_city]
+        # Prepare data for calendar view
+        if 'Pollutant' in df_filtered.columns and selected_pollutants:
+            # If pollutant filter is active, show calendar for selected pollutant
+            daily_data = get_daily_data(filter_key, df_filtered, calendar_city, selected_pollutants[0])
+            title = f"Daily AQI Levels for {calendar_city} - {selected_pollutants[0]}"
+        else:
+            # If no pollutant filter, show overall AQI calendar
+            daily_data = get_daily_data(filter_key, df_filtered, calendar_city)
+            title = f"Daily AQI Levels for {calendar_city}"
         
-        if not city_data.empty:
-            # Prepare data for calendar view
-            if 'Pollutant' in city_data.columns and selected_pollutants:
-                # If pollutant filter is active, show calendar for selected pollutant
-                calendar_data = city_data[city_data['Pollutant'] == selected_pollutants[0]]
-                title = f"Daily AQI Levels for {calendar_city} - {selected_pollutants[0]}"
-            else:
-                # If no pollutant filter, show overall AQI calendar
-                calendar_data = city_data
-                title = f"Daily AQI Levels for {calendar_city}"
-            
-            # Aggregate by date
-            daily_data = calendar_data.groupby('Date')['AQI'].mean().reset_index()
-            
-            # Extract year, month, day components
-            daily_data['Year'] = daily_data['Date'].dt.year
-            daily_data['Month'] = daily_data['Date'].dt.month
-            daily_data['Day'] = daily_data['Date'].dt.day
-            daily_data['MonthName'] = daily_data['Date'].dt.strftime('%B')
-            
+        if not daily_data.empty:
             # Create color scale based on AQI values
             color_scale = alt.Scale(
                 domain=[0, 50, 100, 150, 200, 300, 500],
                 range=['#00e400', '#ffff00', '#ff7e00', '#ff0000', '#99004c', '#7e0023']
             )
             
-            # Create calendar heatmap
+            # Create calendar heatmap; day and month are derived in Vega-Lite via time units
             calendar_chart = alt.Chart(daily_data).mark_rect().encode(
-                x=alt.X('Day:O', title='Day', axis=alt.Axis(labelAngle=0)),
-                y=alt.Y('MonthName:O', title='Month', sort=list(calendar.month_name)[1:]),
+                x=alt.X('date(Date):O', title='Day', axis=alt.Axis(labelAngle=0)),
+                y=alt.Y('month(Date):O', title='Month', axis=alt.Axis(format='%B')),
                 color=alt.Color('AQI:Q', scale=color_scale, legend=alt.Legend(title="AQI Level")),
                 tooltip=[
                     alt.Tooltip('Date:T', title='Date', format='%Y-%m-%d'),
@@ -481,7 +582,7 @@ with tabs[2]:
                 ]
             ).properties(
                 width=alt.Step(30),  # width of each cell
-                height=alt.Step(30) * len(daily_data['MonthName'].unique()),
+                height=alt.Step(30),  # height of each month row
                 title=title
             ).configure_axis(
                 labelFontSize=12,
@@ -494,25 +595,7 @@ with tabs[2]:
             
             # Add explanation of AQI categories
             st.subheader("AQI Categories")
-            categories = [
-                {"range": "0-50", "category": "Good", "color": "#00e400", "description": "Air quality is satisfactory, and air pollution poses little or no risk."},
-                {"range": "51-100", "category": "Moderate", "color": "#ffff00", "description": "Air quality is acceptable. However, there may be a risk for some people, particularly those who are unusually sensitive to air pollution."},
-                {"range": "101-150", "category": "Unhealthy for Sensitive Groups", "color": "#ff7e00", "description": "Members of sensitive groups may experience health effects. The general public is less likely to be affected."},
-                {"range": "151-200", "category": "Unhealthy", "color": "#ff0000", "description": "Some members of the general public may experience health effects; members of sensitive groups may experience more serious health effects."},
-                {"range": "201-300", "category": "Very Unhealthy", "color": "#99004c", "description": "Health alert: The risk of health effects is increased for everyone."},
-                {"range": "301+", "category": "Hazardous", "color": "#7e0023", "description": "Health warning of emergency conditions: everyone is more likely to be affected."}
-            ]
-            
-            # Create a DataFrame for the categories
-            categories_df = pd.DataFrame(categories)
-            
-            # Display the categories as a styled table
-            for i, row in categories_df.iterrows():
-                col1, col2 = st.columns([1, 5])
-                with col1:
-                    st.markdown(f"<div style='background-color: {row['color']}; width: 50px; height: 20px; border-radius: 4px;'></div>", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"**{row['category']} ({row['range']})**: {row['description']}")
+            st.markdown(AQI_CATEGORY_LEGEND_HTML, unsafe_allow_html=True)
         else:
             st.info(f"No data available for {calendar_city} in the selected date range.")
     else: